@@ -6,7 +6,7 @@ from modules.ui import AppUI
 # Initialize managers
 personal_manager = PersonalManager()
 food_manager = FoodManager()
-chart_manager = ChartManager()
+chart_manager = ChartManager(food_manager.cal_store, personal_manager.store)
 
 # Initialize UI
 app_ui = AppUI(personal_manager, food_manager, chart_manager)
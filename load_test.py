@@ -0,0 +1,346 @@
+"""Load test for the Health & Nutrition Tracker.
+
+Simulates concurrent users by calling the ``AppUI`` handlers directly (the same
+functions Gradio runs for each click) against a scratch copy of the data
+folder. Every simulated session logs in, saves personal info and adds food
+with a configurable think time between steps. At the end it prints latency
+percentiles and throughput per handler, then checks the CSV shards and archive
+segments for torn rows and lost appends.
+
+Gradio's queue runs each event with ``default_concurrency_limit=1`` unless
+configured otherwise, so each handler is gated by its own semaphore of
+``--concurrency-limit`` slots. Reported latency is queue wait plus handler
+time as seen by one ``app.py`` process. It excludes network, HTTP and
+browser rendering, so treat it as a lower bound on what users see.
+
+Example:
+    python load_test.py --users 20 --sessions 5 --think-time 0.5
+"""
+
+import argparse
+import csv
+import gzip
+import math
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from modules.managers.personal_manager import PersonalManager
+from modules.managers.food_manager import FoodManager
+from modules.managers.chart_manager import ChartManager
+from modules.ui import AppUI, CHART_MODES
+
+CAL_COLUMNS = ["time", "name", "food", "cal"]
+PERSONAL_COLUMNS = [
+    "time",
+    "name",
+    "sex",
+    "bd",
+    "height",
+    "weight",
+    "bmi",
+    "bmr",
+    "tdee",
+    "activity_level",
+    "height_unit",
+    "weight_unit",
+]
+ACTIVITY_CHOICES = [
+    "ออกกำลังกายน้อยมาก หรือไม่ออกเลย",
+    "ออกกำลังกาย 1-3 ครั้งต่อสัปดาห์",
+    "ออกกำลังกาย 4-5 ครั้งต่อสัปดาห์",
+    "ออกกำลังกาย 6-7 ครั้งต่อสัปดาห์",
+    "ออกกำลังกายวันละ 2 ครั้งขึ้นไป",
+]
+
+
+class LoadStats:
+    def __init__(self, concurrency_limit=1):
+        self._lock = threading.Lock()
+        # One queue per event, like Gradio's per-listener concurrency limit
+        self.slots = defaultdict(lambda: threading.Semaphore(concurrency_limit))
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        # Rows each user should end up with, used for the lost-append check
+        self.expected_food = Counter()
+        self.expected_info = Counter()
+
+    def record(self, op, seconds, ok=True):
+        with self._lock:
+            self.latencies[op].append(seconds)
+            if not ok:
+                self.errors[op] += 1
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def timed(stats, op, fn, *args, image_index=None):
+    """
+    Call a handler and record its latency, including time spent waiting for a
+    queue slot. With ``image_index``, the output at that position must be a
+    rendered static image; a fallback to the interactive chart is an error.
+    """
+    with stats._lock:
+        slot = stats.slots[op]
+    start = time.perf_counter()
+    try:
+        with slot:
+            result = fn(*args)
+    except Exception as e:
+        stats.record(op, time.perf_counter() - start, ok=False)
+        print(f"❌ {op} failed: {e!r}")
+        return None
+    elapsed = time.perf_counter() - start
+
+    if image_index is not None:
+        image = result[image_index]
+        if not (image.get("visible") and image.get("value")):
+            stats.record(op, elapsed, ok=False)
+            print(f"❌ {op} fell back to the interactive chart")
+            # Rows were still written, so the caller keeps counting them
+            return result
+    stats.record(op, elapsed)
+    return result
+
+
+def think(args, rng):
+    if args.think_time > 0:
+        time.sleep(rng.uniform(0, 2 * args.think_time))
+
+
+def run_session(app_ui, food_list, stats, args, user_idx, session_idx):
+    rng = random.Random(args.seed * 100003 + user_idx * 1009 + session_idx)
+    name = f"loadtest_{args.run_id}_user_{user_idx}"
+    chart_mode = CHART_MODES[1] if args.static_chart else CHART_MODES[0]
+    if args.static_chart:
+        # Position of the chart_img update in each handler's outputs
+        login_image, save_image, food_image = 13, 2, 2
+    else:
+        login_image = save_image = food_image = None
+
+    timed(
+        stats, "login", app_ui.login_handler, name, chart_mode, image_index=login_image
+    )
+    think(args, rng)
+
+    result = timed(
+        stats,
+        "save_info",
+        app_ui.save_info_handler,
+        name,
+        rng.choice(["Male", "Female"]),
+        str(rng.randint(1, 28)),
+        "Jan",
+        str(rng.randint(1960, 2005)),
+        rng.randint(150, 195),
+        rng.randint(45, 110),
+        "cm",
+        "kg",
+        rng.choice(ACTIVITY_CHOICES),
+        chart_mode,
+        image_index=save_image,
+    )
+    if result is not None:
+        with stats._lock:
+            stats.expected_info[name] += 1
+    think(args, rng)
+
+    for _ in range(args.foods_per_session):
+        quantity = rng.randint(1, args.max_quantity)
+        result = timed(
+            stats,
+            "add_food",
+            app_ui.add_food_handler,
+            name,
+            rng.choice(food_list),
+            quantity,
+            chart_mode,
+            image_index=food_image,
+        )
+        if result is not None:
+            with stats._lock:
+                stats.expected_food[name] += quantity
+        think(args, rng)
+
+
+def check_csv(path, columns, numeric_columns, counts):
+    """Count rows per user into ``counts`` and return problems for one file."""
+    problems = []
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header != columns:
+            problems.append(f"{path.name}: unexpected header {header}")
+            return problems
+        for line_no, row in enumerate(reader, start=2):
+            if len(row) != len(columns):
+                problems.append(
+                    f"{path.name}:{line_no}: torn row, "
+                    f"{len(row)} fields instead of {len(columns)}"
+                )
+                continue
+            record = dict(zip(columns, row))
+            try:
+                datetime.fromisoformat(record["time"])
+                for col in numeric_columns:
+                    float(record[col])
+            except ValueError:
+                problems.append(f"{path.name}:{line_no}: corrupted row {row}")
+                continue
+            counts[record["name"]] += 1
+    return problems
+
+
+def check_store(store, columns, numeric_columns):
+    """Return (rows per user, list of problems) across shards and archives."""
+    counts = Counter()
+    problems = []
+    for path in store.files():
+        problems += check_csv(path, columns, numeric_columns, counts)
+    return counts, problems
+
+
+def run_user(app_ui, food_list, stats, args, user_idx):
+    # A user's sessions run back to back, never two at once
+    for session_idx in range(args.sessions):
+        run_session(app_ui, food_list, stats, args, user_idx, session_idx)
+
+
+def check_integrity(food_manager, personal_manager, stats):
+    food_counts, problems = check_store(food_manager.cal_store, CAL_COLUMNS, ["cal"])
+    info_counts, info_problems = check_store(
+        personal_manager.store,
+        PERSONAL_COLUMNS,
+        ["height", "weight", "bmi", "bmr", "tdee"],
+    )
+    problems += info_problems
+
+    for label, expected, actual in (
+        ("cal_rec", stats.expected_food, food_counts),
+        ("personal_info", stats.expected_info, info_counts),
+    ):
+        for name, count in sorted(expected.items()):
+            if actual[name] < count:
+                problems.append(
+                    f"{label}: {name} has {actual[name]} rows, expected {count} "
+                    f"({count - actual[name]} lost)"
+                )
+            elif actual[name] > count:
+                # A handler that raised after writing leaves uncounted rows
+                problems.append(
+                    f"{label}: {name} has {actual[name]} rows, expected {count} "
+                    f"({actual[name] - count} surplus, see handler errors)"
+                )
+    return problems
+
+
+def print_report(stats, elapsed):
+    total_ops = sum(len(v) for v in stats.latencies.values())
+    print(
+        f"\n{'handler':<12}{'count':>8}{'errors':>8}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    )
+    for op in ("login", "save_info", "add_food"):
+        values = stats.latencies.get(op, [])
+        print(
+            f"{op:<12}{len(values):>8}{stats.errors[op]:>8}"
+            f"{percentile(values, 50) * 1000:>10.1f}"
+            f"{percentile(values, 95) * 1000:>10.1f}"
+            f"{percentile(values, 99) * 1000:>10.1f}"
+            f"{max(values, default=0) * 1000:>10.1f}"
+        )
+    throughput = total_ops / elapsed if elapsed else 0
+    print(f"\nTotal: {total_ops} requests in {elapsed:.2f}s ({throughput:.1f} req/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="concurrent users")
+    parser.add_argument("--sessions", type=int, default=3, help="sessions per user")
+    parser.add_argument("--foods-per-session", type=int, default=3)
+    parser.add_argument("--max-quantity", type=int, default=3)
+    parser.add_argument(
+        "--think-time", type=float, default=0.2, help="mean seconds between clicks"
+    )
+    parser.add_argument(
+        "--data-folder",
+        default=None,
+        help="data folder to run against (default: scratch copy of ./data)",
+    )
+    parser.add_argument(
+        "--concurrency-limit",
+        type=int,
+        default=1,
+        help="calls per handler at once, as in demo.queue(default_concurrency_limit)",
+    )
+    parser.add_argument("--static-chart", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.concurrency_limit < 1:
+        parser.error("--concurrency-limit must be at least 1")
+    # Unique names keep the lost-append check valid on a reused data folder
+    args.run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+
+    scratch = None
+    # Chart images never go into the data folder, even a user-supplied one
+    cache_folder = tempfile.mkdtemp(prefix="healthstat_load_cache_")
+    if args.data_folder is None:
+        scratch = tempfile.mkdtemp(prefix="healthstat_load_")
+        shutil.copytree("data", scratch, dirs_exist_ok=True)
+        data_folder = scratch
+    else:
+        data_folder = args.data_folder
+
+    personal_manager = PersonalManager(data_folder)
+    food_manager = FoodManager(data_folder)
+    chart_manager = ChartManager(
+        food_manager.cal_store, personal_manager.store, cache_folder=cache_folder
+    )
+    app_ui = AppUI(personal_manager, food_manager, chart_manager)
+    food_list = food_manager.get_food_list()
+    stats = LoadStats(args.concurrency_limit)
+
+    print(f"Running {args.users} users x {args.sessions} sessions on {data_folder}")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        futures = [
+            pool.submit(run_user, app_ui, food_list, stats, args, u)
+            for u in range(args.users)
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    print_report(stats, elapsed)
+    errors = sum(stats.errors.values())
+    if errors:
+        print(f"\n❌ {errors} handler error(s), see the errors column")
+    problems = check_integrity(food_manager, personal_manager, stats)
+    if problems:
+        print(f"\n❌ {len(problems)} data-integrity problem(s):")
+        for problem in problems:
+            print(f"  - {problem}")
+    else:
+        print("\n✅ No torn rows or lost appends found")
+
+    shutil.rmtree(cache_folder, ignore_errors=True)
+    if scratch is not None:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return 1 if problems or errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,44 +1,116 @@
+import hashlib
+import re
+import tempfile
+import time
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
 from pathlib import Path
+from modules.managers.history_store import HistoryStore
 
 
 class ChartManager:
+    IMAGE_FORMATS = ("png", "svg")
+    # Stale renders younger than this may still be in flight to a client
+    STALE_RENDER_GRACE_SECONDS = 300
+    # Keys include the date, so any file older than a day can never be hit
+    CACHE_MAX_AGE_SECONDS = 24 * 60 * 60
+
     def __init__(
-        self, cal_file="data/cal_rec.csv", personal_file="data/personal_info.csv"
+        self,
+        cal_store: HistoryStore,
+        personal_store: HistoryStore,
+        cache_folder="cache/charts",
     ):
-        self.cal_file = cal_file
-        self.personal_file = personal_file
+        # Shares the managers' stores rather than opening the folders again
+        self.cal_store = cal_store
+        self.personal_store = personal_store
+        self.cache_folder = Path(cache_folder)
+
+    def _data_version(self, user: str) -> str:
+        # Any write to the user's shards changes mtime/size, and the 7-day
+        # window moves with the date, so both go into the cache key.
+        parts = [datetime.today().date().isoformat()]
+        for store in (self.cal_store, self.personal_store):
+            path = store.shard_file(user)
+            if path.exists():
+                stat = path.stat()
+                parts.append(f"{stat.st_mtime_ns}-{stat.st_size}")
+            else:
+                parts.append("missing")
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+    @staticmethod
+    def _user_key(user: str) -> str:
+        # Names can be Thai or contain path characters, so keep a readable
+        # ASCII slug plus a hash to stay unique.
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "_", user).strip("_")[:32] or "user"
+        digest = hashlib.sha1(user.encode()).hexdigest()[:8]
+        return f"{slug}-{digest}"
+
+    def render_last_7_days_image(
+        self, user="default", fmt="png", width=900, height=500
+    ) -> str:
+        """Render the 7-day chart to a static image and return its file path.
+
+        Images are cached per user and data version, so repeated requests
+        for unchanged data skip the render. Requires the ``kaleido`` package.
+        """
+        if fmt not in self.IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {fmt}")
+
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        user_key = self._user_key(user)
+        version = self._data_version(user)
+        image_file = self.cache_folder / f"{user_key}_{version}_{width}x{height}.{fmt}"
+        if image_file.exists():
+            return str(image_file)
+
+        fig = self.build_last_7_days_chart(user)
+        image_bytes = fig.to_image(format=fmt, width=width, height=height)
+        # Unique temp file per render, so concurrent renders of the same image
+        # never share a file; the last replace() wins with identical content
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_folder, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp.write(image_bytes)
+        Path(tmp.name).replace(image_file)
+
+        self._prune_cache(user_key, image_file)
+        return str(image_file)
+
+    def _prune_cache(self, user_key: str, keep_file: Path):
+        # This user's stale renders go after a short grace period, in case
+        # another request just returned them; everyone else's once they are
+        # too old to match today's key, so the cache does not keep growing
+        now = time.time()
+        for old_file in self.cache_folder.iterdir():
+            if old_file == keep_file:
+                continue
+            if old_file.name.startswith(f"{user_key}_"):
+                max_age = self.STALE_RENDER_GRACE_SECONDS
+            else:
+                max_age = self.CACHE_MAX_AGE_SECONDS
+            try:
+                if old_file.stat().st_mtime < now - max_age:
+                    old_file.unlink()
+            except OSError:
+                # Already removed by a concurrent render
+                pass
 
     def build_last_7_days_chart(self, user="default"):
-        # Load CSVs
-        cal_df = (
-            pd.read_csv(self.cal_file, parse_dates=["time"])
-            if Path(self.cal_file).exists()
-            else pd.DataFrame()
-        )
-        personal_df = (
-            pd.read_csv(self.personal_file, parse_dates=["time"])
-            if Path(self.personal_file).exists()
-            else pd.DataFrame()
-        )
-
         today = datetime.today().date()
         date_range = pd.date_range(end=today, periods=7).date
 
-        # Filter by user
-        cal_df = (
-            cal_df[cal_df["name"] == user]
-            if not cal_df.empty
-            else pd.DataFrame(columns=["time", "food", "cal"])
-        )
-        personal_df = (
-            personal_df[personal_df["name"] == user]
-            if not personal_df.empty
-            else pd.DataFrame(columns=["time", "tdee"])
-        )
+        # Load only this user's shard rows inside the 7-day window
+        since = datetime.combine(date_range[0], datetime.min.time())
+        cal_df = self.cal_store.load(user, since=since)
+        personal_df = self.personal_store.load(user, since=since)
+        if cal_df.empty:
+            cal_df = pd.DataFrame(columns=["time", "food", "cal"])
+        if personal_df.empty:
+            personal_df = pd.DataFrame(columns=["time", "tdee"])
 
         # Process food intake
         if not cal_df.empty:
@@ -1,14 +1,17 @@
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
+from modules.managers.history_store import HistoryStore
 
 
 class FoodManager:
-    def __init__(self, data_folder="data"):
+    def __init__(self, data_folder="data", retention_days=30):
         self.data_folder = Path(data_folder)
         self.data_folder.mkdir(exist_ok=True)
         self.food_file = self.data_folder / "food_data.csv"
-        self.cal_file = self.data_folder / "cal_rec.csv"
+        self.cal_store = HistoryStore(
+            self.data_folder, "cal_rec", retention_days=retention_days
+        )
         if not self.food_file.exists():
             pd.DataFrame(columns=["food", "cal"]).to_csv(self.food_file, index=False)
 
@@ -25,8 +28,5 @@ class FoodManager:
         record = pd.DataFrame(
             [{"time": datetime.now(), "name": user, "food": food_name, "cal": cal}]
         )
-        if self.cal_file.exists() and self.cal_file.stat().st_size > 0:
-            record.to_csv(self.cal_file, mode="a", header=False, index=False)
-        else:
-            record.to_csv(self.cal_file, index=False)
+        self.cal_store.append(record, user)
         return True, f"✅ Added {food_name} ({cal} cal)!"
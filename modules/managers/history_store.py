@@ -0,0 +1,233 @@
+import csv
+import gzip
+import hashlib
+import tempfile
+import threading
+import pandas as pd
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# One lock per store folder, shared by every manager that opens it
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _folder_lock(folder: Path) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(str(folder.resolve()), threading.Lock())
+
+
+class HistoryStore:
+    """
+    Append-only history split into hash-bucketed shard files.
+
+    Records live in ``<data_folder>/<name>/bucket_XX.csv`` so a user only reads
+    their own bucket. Rows older than ``retention_days`` are moved into gzip
+    archive segments under ``archive/`` that are read only for long-range
+    queries. Retention runs once at startup and then daily per bucket on
+    append. A legacy single ``<name>.csv`` file is split into shards on first
+    use and renamed to ``<name>.csv.migrated``.
+    """
+
+    def __init__(
+        self,
+        data_folder,
+        name: str,
+        n_buckets: int = 16,
+        retention_days: int = 30,
+        keep_latest: bool = False,
+    ):
+        self.folder = Path(data_folder) / name
+        self.archive_folder = self.folder / "archive"
+        self.archive_folder.mkdir(parents=True, exist_ok=True)
+        self.legacy_file = Path(data_folder) / f"{name}.csv"
+        self.n_buckets = n_buckets
+        self.retention_days = retention_days
+        # Keep each user's newest row live, e.g. for the last personal entry
+        self.keep_latest = keep_latest
+        self._lock = _folder_lock(self.folder)
+        self._retention_checked = {}
+        self._migrate_legacy()
+        self.apply_retention()
+
+    def _bucket(self, user: str) -> int:
+        return int(hashlib.sha1(str(user).encode()).hexdigest(), 16) % self.n_buckets
+
+    def shard_file(self, user: str) -> Path:
+        return self.folder / f"bucket_{self._bucket(user):02d}.csv"
+
+    def _archive_files(self, shard: Path) -> list:
+        return sorted(self.archive_folder.glob(f"{shard.stem}_*.csv.gz"))
+
+    def files(self) -> list:
+        """All live shards followed by all archive segments."""
+        return sorted(self.folder.glob("bucket_*.csv")) + sorted(
+            self.archive_folder.glob("*.csv.gz")
+        )
+
+    def cutoff(self) -> datetime:
+        today = datetime.combine(datetime.today().date(), datetime.min.time())
+        return today - timedelta(days=self.retention_days)
+
+    @staticmethod
+    def _read(path: Path) -> pd.DataFrame:
+        if not path.exists() or path.stat().st_size == 0:
+            return pd.DataFrame()
+        # Names like "007" or "None" must stay text, so only empty cells are NA
+        df = pd.read_csv(
+            path, dtype={"name": str}, keep_default_na=False, na_values=[""]
+        )
+        # datetime.now() drops ".ffffff" on microsecond 0, so formats can mix
+        df["time"] = pd.to_datetime(df["time"], format="ISO8601")
+        return df
+
+    @staticmethod
+    def _replace_file(path: Path, write):
+        # Write through a unique temp file so readers never see a partial file
+        with tempfile.NamedTemporaryFile(
+            "w", dir=path.parent, suffix=".tmp", delete=False, newline=""
+        ) as tmp:
+            write(tmp)
+        Path(tmp.name).replace(path)
+
+    def _migrate_legacy(self):
+        # Works on raw CSV text and skips rows a shard already holds, so a run
+        # interrupted before the final rename can simply be repeated.
+        with self._lock:
+            if not self.legacy_file.exists():
+                return
+            with open(self.legacy_file, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                rows = list(reader)
+
+            if header:
+                name_idx = header.index("name")
+                by_bucket = {}
+                for row in rows:
+                    if row:
+                        bucket = self._bucket(row[name_idx])
+                        by_bucket.setdefault(bucket, []).append(row)
+
+                for bucket, new_rows in sorted(by_bucket.items()):
+                    shard = self.folder / f"bucket_{bucket:02d}.csv"
+                    existing = []
+                    if shard.exists() and shard.stat().st_size > 0:
+                        with open(shard, newline="", encoding="utf-8") as f:
+                            existing = list(csv.reader(f))[1:]
+                    seen = {tuple(row) for row in existing}
+                    missing = [row for row in new_rows if tuple(row) not in seen]
+                    if not missing:
+                        continue
+
+                    def write(f, existing=existing, missing=missing):
+                        writer = csv.writer(f, lineterminator="\n")
+                        writer.writerow(header)
+                        writer.writerows(existing + missing)
+
+                    self._replace_file(shard, write)
+
+            self.legacy_file.replace(self.legacy_file.with_suffix(".csv.migrated"))
+
+    @staticmethod
+    def _write_rows(shard: Path, df: pd.DataFrame):
+        if shard.exists() and shard.stat().st_size > 0:
+            df.to_csv(shard, mode="a", header=False, index=False)
+        else:
+            df.to_csv(shard, index=False)
+
+    def append(self, record: pd.DataFrame, user: str):
+        shard = self.shard_file(user)
+        with self._lock:
+            self._write_rows(shard, record)
+            # Check each bucket at most once a day so appends stay cheap
+            today = datetime.today().date()
+            if self._retention_checked.get(shard) != today:
+                self._retention_checked[shard] = today
+                self._apply_retention(shard)
+
+    def load(self, user: str, since=None) -> pd.DataFrame:
+        """
+        Return the user's rows, oldest first. Archive segments are only read
+        when ``since`` is None or earlier than the retention cutoff.
+        """
+        shard = self.shard_file(user)
+        # Reads share the writers' lock so they never see a half-written row
+        with self._lock:
+            frames = []
+            if since is None or pd.Timestamp(since) < pd.Timestamp(self.cutoff()):
+                frames += [self._read(f) for f in self._archive_files(shard)]
+            frames.append(self._read(shard))
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True)
+        df = df[df["name"].astype(str) == str(user)]
+        if since is not None:
+            df = df[df["time"] >= pd.Timestamp(since)]
+        return df.sort_values("time", kind="stable").reset_index(drop=True)
+
+    def latest(self, user: str) -> dict:
+        """
+        Return the user's newest row. With ``keep_latest`` that row is always
+        in the live shard, so a miss means the user has no record; otherwise
+        archives are searched as a fallback.
+        """
+        with self._lock:
+            df = self._read(self.shard_file(user))
+        if not df.empty:
+            df = df[df["name"].astype(str) == str(user)]
+        if df.empty and not self.keep_latest:
+            df = self.load(user)
+        return df.iloc[-1].to_dict() if not df.empty else {}
+
+    def apply_retention(self):
+        """Move rows older than the retention horizon into archive segments."""
+        today = datetime.today().date()
+        with self._lock:
+            for shard in sorted(self.folder.glob("bucket_*.csv")):
+                self._retention_checked[shard] = today
+                self._apply_retention(shard)
+
+    def _apply_retention(self, shard: Path):
+        # Works on raw CSV rows so other users' data is copied byte for byte
+        if not shard.exists() or shard.stat().st_size == 0:
+            return
+        with open(shard, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            rows = [row for row in reader if row]
+        if not header or not rows:
+            return
+
+        time_idx = header.index("time")
+        name_idx = header.index("name")
+        cutoff = self.cutoff()
+        latest = {row[name_idx]: i for i, row in enumerate(rows)}
+        old = []
+        for i, row in enumerate(rows):
+            try:
+                expired = datetime.fromisoformat(row[time_idx]) < cutoff
+            except (ValueError, IndexError):
+                # Leave unreadable rows live rather than guess their age
+                expired = False
+            if self.keep_latest and latest.get(row[name_idx]) == i:
+                expired = False
+            old.append(expired)
+        if not any(old):
+            return
+
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        segment = self.archive_folder / f"{shard.stem}_{stamp}.csv.gz"
+        with gzip.open(segment, "wt", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(header)
+            writer.writerows(row for row, expired in zip(rows, old) if expired)
+
+        def write(f):
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(header)
+            writer.writerows(row for row, expired in zip(rows, old) if not expired)
+
+        self._replace_file(shard, write)
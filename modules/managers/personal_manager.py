@@ -2,36 +2,38 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 from modules.calculators.health_calculators import BMI, BMR, TDEE
+from modules.managers.history_store import HistoryStore
 
 
 class PersonalManager:
-    def __init__(self, data_folder="data"):
+    def __init__(self, data_folder="data", retention_days=30):
         self.data_folder = Path(data_folder)
         self.data_folder.mkdir(exist_ok=True)
-        self.file = self.data_folder / "personal_info.csv"
+        # The newest entry per user stays live, so logins never touch archives
+        self.store = HistoryStore(
+            self.data_folder,
+            "personal_info",
+            retention_days=retention_days,
+            keep_latest=True,
+        )
 
     def load_last_entry(self, user="default") -> dict:
-        if self.file.exists() and self.file.stat().st_size > 0:
-            df = pd.read_csv(self.file)
-            user_df = df[df["name"] == user] if "name" in df.columns else df
-            if not user_df.empty:
-                record = user_df.iloc[-1].to_dict()
-
-                # Convert height/weight to preferred unit for display
-                height_unit = record.get("height_unit", "cm")
-                weight_unit = record.get("weight_unit", "kg")
-                height = record.get("height", 0)
-                weight = record.get("weight", 0)
+        record = self.store.latest(user)
+        if record:
+            # Convert height/weight to preferred unit for display
+            height_unit = record.get("height_unit", "cm")
+            weight_unit = record.get("weight_unit", "kg")
+            height = record.get("height", 0)
+            weight = record.get("weight", 0)
 
-                if height_unit == "ft":
-                    record["height"] = round(height / 30.48, 2)
-                if weight_unit == "lbs":
-                    record["weight"] = round(weight * 2.20462, 2)
+            if height_unit == "ft":
+                record["height"] = round(height / 30.48, 2)
+            if weight_unit == "lbs":
+                record["weight"] = round(weight * 2.20462, 2)
 
-                record["height_unit"] = height_unit
-                record["weight_unit"] = weight_unit
-                return record
-        return {}
+            record["height_unit"] = height_unit
+            record["weight_unit"] = weight_unit
+        return record
 
     def save_info(
         self,
@@ -78,9 +80,6 @@ class PersonalManager:
             ]
         )
 
-        if self.file.exists() and self.file.stat().st_size > 0:
-            record.to_csv(self.file, mode="a", header=False, index=False)
-        else:
-            record.to_csv(self.file, index=False)
+        self.store.append(record, user)
 
         return bmi, bmr, tdee
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import logging
 import gradio as gr
 from datetime import datetime
 import plotly.graph_objects as go
@@ -70,6 +71,10 @@ class HealthCalcTheme(Base):
 
 HCT = HealthCalcTheme()
 
+logger = logging.getLogger(__name__)
+
+CHART_MODES = ["Interactive", "Static image"]
+
 
 class AppUI:
     def __init__(self, personal_manager, food_manager, chart_manager):
@@ -89,6 +94,33 @@ class AppUI:
         )
         return fig
 
+    def _chart_outputs(self, name, chart_mode):
+        # Returns updates for (chart_plot, chart_img) plus an error message or
+        # None; only one chart is visible. A failed static render falls back
+        # to the interactive figure so the handler still completes.
+        error = None
+        if chart_mode == CHART_MODES[1]:
+            try:
+                image = self.chart_manager.render_last_7_days_image(name)
+                return (
+                    gr.update(visible=False),
+                    gr.update(value=image, visible=True),
+                    None,
+                )
+            except Exception:
+                logger.exception("Static chart render failed for %r", name)
+                error = "⚠️ Static chart unavailable, showing interactive chart."
+        chart = self.chart_manager.build_last_7_days_chart(name)
+        return gr.update(value=chart, visible=True), gr.update(visible=False), error
+
+    def chart_mode_handler(self, name, chart_mode):
+        # Not logged in yet: nothing to render
+        if not name:
+            return gr.update(), gr.update(), gr.update()
+        chart, chart_img, error = self._chart_outputs(name, chart_mode)
+        popup = self._announcement(error, success=False) if error else gr.update()
+        return chart, chart_img, popup
+
     @staticmethod
     def _announcement(msg, success=True):
         # Hex colors from HealthCalcTheme
@@ -117,13 +149,16 @@ class AppUI:
         return gr.update(value=html_content, visible=True)
 
     # --- LOGIN ---
-    def login_handler(self, login_name):
+    def login_handler(self, login_name, chart_mode=CHART_MODES[0]):
         self.session_name = login_name
         name_box_val = login_name
         record = self.personal_manager.load_last_entry(login_name)
 
+        popup = gr.update(value="", visible=False)
         if record:
-            chart = self.chart_manager.build_last_7_days_chart(login_name)
+            chart, chart_img, error = self._chart_outputs(login_name, chart_mode)
+            if error:
+                popup = self._announcement(error, success=False)
             bmi = record.get("bmi", 0)
             bmr = record.get("bmr", 0)
             tdee = record.get("tdee", 0)
@@ -156,13 +191,21 @@ class AppUI:
                 weight_unit,
                 activity_val,
                 chart,
+                chart_img,
                 bmi,
                 bmr,
                 tdee,
-                gr.update(value="", visible=False),
+                popup,
                 gr.update(value="", visible=False),
             )
         else:
+            if chart_mode == CHART_MODES[1]:
+                chart, chart_img, error = self._chart_outputs(login_name, chart_mode)
+                if error:
+                    popup = self._announcement(error, success=False)
+            else:
+                chart = gr.update(value=self._empty_chart(), visible=True)
+                chart_img = gr.update(visible=False)
             return (
                 gr.update(visible=False),
                 name_box_val,
@@ -176,11 +219,12 @@ class AppUI:
                 "cm",
                 "kg",
                 "ออกกำลังกายน้อยมาก หรือไม่ออกเลย",
-                self._empty_chart(),
+                chart,
+                chart_img,
                 0,
                 0,
                 0,
-                gr.update(value="", visible=False),
+                popup,
                 gr.update(value="", visible=False),
             )
 
@@ -197,6 +241,7 @@ class AppUI:
         height_unit,
         weight_unit,
         activity,
+        chart_mode=CHART_MODES[0],
     ):
         bd = f"{bd_day}:{bd_month}:{bd_year}"
         activity_map = {
@@ -210,17 +255,21 @@ class AppUI:
         bmi, bmr, tdee = self.personal_manager.save_info(
             name, sex, bd, height, weight, activity_key, height_unit, weight_unit
         )
-        chart = self.chart_manager.build_last_7_days_chart(name)
+        chart, chart_img, error = self._chart_outputs(name, chart_mode)
+        msg = f"✅ Saved! BMI:{bmi}, BMR:{bmr}, TDEE:{tdee}"
+        if error:
+            msg += "<br>" + error
         return (
-            self._announcement(f"✅ Saved! BMI:{bmi}, BMR:{bmr}, TDEE:{tdee}"),
+            self._announcement(msg, success=error is None),
             chart,
+            chart_img,
             bmi,
             bmr,
             tdee,
         )
 
     # --- ADD FOOD ---
-    def add_food_handler(self, name, food_name, quantity):
+    def add_food_handler(self, name, food_name, quantity, chart_mode=CHART_MODES[0]):
         msg = ""
         success = True
         for _ in range(int(quantity)):
@@ -229,13 +278,17 @@ class AppUI:
             if not s:
                 success = False
         record = self.personal_manager.load_last_entry(name)
-        chart = self.chart_manager.build_last_7_days_chart(name)
+        chart, chart_img, error = self._chart_outputs(name, chart_mode)
+        if error:
+            msg += error
+            success = False
         bmi = record.get("bmi", 0)
         bmr = record.get("bmr", 0)
         tdee = record.get("tdee", 0)
         return (
             AppUI._announcement(msg, success),
             chart,
+            chart_img,
             bmi,
             bmr,
             tdee,
@@ -260,7 +313,18 @@ class AppUI:
                     # MAIN TAB
                     with gr.Tab("Main"):
                         name_box = gr.Textbox(label="Full Name", interactive=False)
+                        chart_mode = gr.Radio(
+                            choices=CHART_MODES,
+                            value=CHART_MODES[0],
+                            label="Chart Mode",
+                        )
                         chart_plot = gr.Plot(self._empty_chart())
+                        chart_img = gr.Image(
+                            type="filepath",
+                            interactive=False,
+                            show_label=False,
+                            visible=False,
+                        )
                         with gr.Row():
                             bmi_out = gr.Number(label="BMI", interactive=False)
                             bmr_out = gr.Number(label="BMR", interactive=False)
@@ -284,12 +348,19 @@ class AppUI:
                         add_btn = gr.Button("Add Food", variant="primary")
                         popup_food = gr.HTML(value="", visible=False)
 
+                        chart_mode.change(
+                            fn=self.chart_mode_handler,
+                            inputs=[name_box, chart_mode],
+                            outputs=[chart_plot, chart_img, popup_food],
+                        )
+
                         add_btn.click(
                             fn=self.add_food_handler,
-                            inputs=[name_box, food_dropdown, food_quantity],
+                            inputs=[name_box, food_dropdown, food_quantity, chart_mode],
                             outputs=[
                                 popup_food,
                                 chart_plot,
+                                chart_img,
                                 bmi_out,
                                 bmr_out,
                                 tdee_out,
@@ -370,10 +441,12 @@ class AppUI:
                                 height_unit,
                                 weight_unit,
                                 activity,
+                                chart_mode,
                             ],
                             outputs=[
                                 popup_info,
                                 chart_plot,
+                                chart_img,
                                 bmi_out,
                                 bmr_out,
                                 tdee_out,
@@ -388,7 +461,7 @@ class AppUI:
 
             login_btn.click(
                 fn=self.login_handler,
-                inputs=[login_name],
+                inputs=[login_name, chart_mode],
                 outputs=[
                     login_page,
                     name_box,
@@ -403,11 +476,12 @@ class AppUI:
                     weight_unit,
                     activity,
                     chart_plot,
+                    chart_img,
                     bmi_out,
                     bmr_out,
                     tdee_out,
-                    gr.HTML(value="", visible=False),  # popup_food
-                    gr.HTML(value="", visible=False),  # popup_info
+                    popup_food,
+                    popup_info,
                 ],
             )
         return demo
@@ -0,0 +1,112 @@
+import logging
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from modules.managers.chart_manager import ChartManager
+from modules.managers.history_store import HistoryStore
+
+
+class FakeFigure:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def to_image(self, format, width, height):
+        self.calls.append(format)
+        return b"image"
+
+
+@pytest.fixture
+def chart_manager(tmp_path, monkeypatch):
+    manager = ChartManager(
+        HistoryStore(tmp_path / "data", "cal_rec"),
+        HistoryStore(tmp_path / "data", "personal_info", keep_latest=True),
+        cache_folder=tmp_path / "cache",
+    )
+    manager.render_calls = []
+    # Stand in for kaleido so the cache logic runs without a browser
+    monkeypatch.setattr(
+        manager,
+        "build_last_7_days_chart",
+        lambda user="default": FakeFigure(manager.render_calls),
+    )
+    return manager
+
+
+def add_food(manager, user):
+    record = pd.DataFrame(
+        [{"time": datetime.now(), "name": user, "food": "Rice", "cal": 200}]
+    )
+    manager.cal_store.append(record, user)
+
+
+def age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_unchanged_data_is_a_cache_hit(chart_manager):
+    first = chart_manager.render_last_7_days_image("New")
+    second = chart_manager.render_last_7_days_image("New")
+
+    assert first == second
+    assert len(chart_manager.render_calls) == 1
+
+
+def test_append_to_shard_changes_cache_key(chart_manager):
+    first = chart_manager.render_last_7_days_image("New")
+    add_food(chart_manager, "New")
+    second = chart_manager.render_last_7_days_image("New")
+
+    assert first != second
+    assert len(chart_manager.render_calls) == 2
+
+
+def test_stale_renders_pruned_only_after_grace_period(chart_manager):
+    first = chart_manager.render_last_7_days_image("New")
+    age(first, chart_manager.STALE_RENDER_GRACE_SECONDS - 60)
+    add_food(chart_manager, "New")
+    second = chart_manager.render_last_7_days_image("New")
+    assert os.path.exists(first)
+
+    age(first, chart_manager.STALE_RENDER_GRACE_SECONDS + 60)
+    add_food(chart_manager, "New")
+    chart_manager.render_last_7_days_image("New")
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+
+def test_other_users_renders_pruned_after_max_age(chart_manager):
+    recent = chart_manager.render_last_7_days_image("Star")
+    expired = chart_manager.render_last_7_days_image("James")
+    age(recent, chart_manager.STALE_RENDER_GRACE_SECONDS + 60)
+    age(expired, chart_manager.CACHE_MAX_AGE_SECONDS + 60)
+
+    chart_manager.render_last_7_days_image("New")
+
+    assert os.path.exists(recent)
+    assert not os.path.exists(expired)
+
+
+def test_ui_falls_back_to_interactive_chart_when_render_fails(
+    chart_manager, monkeypatch, caplog
+):
+    pytest.importorskip("gradio")
+    from modules.ui import AppUI, CHART_MODES
+
+    def broken_to_image(self, format, width, height):
+        raise RuntimeError("no browser")
+
+    monkeypatch.setattr(FakeFigure, "to_image", broken_to_image)
+    app_ui = AppUI(None, None, chart_manager)
+
+    with caplog.at_level(logging.ERROR, logger="modules.ui"):
+        chart, chart_img, error = app_ui._chart_outputs("New", CHART_MODES[1])
+
+    assert chart["visible"] is True
+    assert chart_img["visible"] is False
+    assert error is not None
+    assert "no browser" in caplog.text
@@ -0,0 +1,134 @@
+import csv
+import gzip
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from modules.managers.history_store import HistoryStore
+
+HEADER = ["time", "name", "food", "cal"]
+
+
+def write_legacy(folder, rows):
+    with open(folder / "cal_rec.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def record(time, name, food="Rice", cal=200):
+    return pd.DataFrame([{"time": time, "name": name, "food": food, "cal": cal}])
+
+
+def test_migration_splits_legacy_file_and_renames_it(tmp_path):
+    rows = [
+        ["2025-09-15 16:30:39.822723", "New", "Rice", "200"],
+        ["2025-09-15 16:31:00.000001", "Star", "Pad Thai", "400"],
+        ["2025-09-15 16:32:00.000002", "New", "Sushi", "250"],
+    ]
+    write_legacy(tmp_path, rows)
+
+    store = HistoryStore(tmp_path, "cal_rec", retention_days=100000)
+
+    assert not (tmp_path / "cal_rec.csv").exists()
+    assert (tmp_path / "cal_rec.csv.migrated").exists()
+    assert len(store.load("New")) == 2
+    assert len(store.load("Star")) == 1
+
+
+def test_interrupted_migration_does_not_duplicate_rows(tmp_path):
+    rows = [
+        ["2025-09-15 16:30:39.822723", "New", "Rice", "200"],
+        ["2025-09-15 16:32:00.000002", "New", "Sushi", "250"],
+    ]
+    write_legacy(tmp_path, rows)
+    HistoryStore(tmp_path, "cal_rec", retention_days=100000)
+    # Simulate a crash before the rename: the legacy file is still there
+    (tmp_path / "cal_rec.csv.migrated").replace(tmp_path / "cal_rec.csv")
+
+    store = HistoryStore(tmp_path, "cal_rec", retention_days=100000)
+
+    assert len(store.load("New")) == 2
+
+
+def test_retention_moves_old_rows_to_archive(tmp_path):
+    store = HistoryStore(tmp_path, "cal_rec", retention_days=30)
+    now = datetime.now()
+    old_row = record(now - timedelta(days=60), "New", food="Old")
+    # Bypass append so the daily retention check has not run yet
+    store._write_rows(store.shard_file("New"), old_row)
+    store.append(record(now, "New", food="Fresh"), "New")
+
+    assert len(store._archive_files(store.shard_file("New"))) == 1
+    recent = store.load("New", since=now - timedelta(days=6))
+    assert recent["food"].tolist() == ["Fresh"]
+    assert store.load("New")["food"].tolist() == ["Old", "Fresh"]
+
+
+def test_keep_latest_keeps_newest_old_row_live(tmp_path):
+    store = HistoryStore(
+        tmp_path, "personal_info", retention_days=30, keep_latest=True
+    )
+    now = datetime.now()
+    shard = store.shard_file("New")
+    store._write_rows(shard, record(now - timedelta(days=90), "New", cal=1))
+    store._write_rows(shard, record(now - timedelta(days=60), "New", cal=2))
+
+    store.apply_retention()
+
+    assert store.latest("New")["cal"] == 2
+    assert len(store._archive_files(shard)) == 1
+
+
+def test_latest_with_keep_latest_ignores_archive_segments(tmp_path):
+    store = HistoryStore(
+        tmp_path, "personal_info", retention_days=30, keep_latest=True
+    )
+    # Plant an archived row for a user who has nothing in the live shard
+    segment = store.archive_folder / f"{store.shard_file('Gone').stem}_1.csv.gz"
+    with gzip.open(segment, "wt", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(HEADER)
+        writer.writerow(["2020-01-01 00:00:00.000001", "Gone", "Rice", "200"])
+
+    assert store.latest("Gone") == {}
+    assert len(store.load("Gone")) == 1
+
+
+def test_retention_keeps_other_users_rows_verbatim(tmp_path):
+    store = HistoryStore(tmp_path, "cal_rec", n_buckets=1, retention_days=30)
+    now = datetime.now()
+    old = (now - timedelta(days=60)).isoformat(sep=" ")
+    fresh = now.replace(microsecond=0).isoformat(sep=" ")
+    rows = [
+        [old, "007", "Rice", "200"],
+        [fresh, "007", "Rice", "200"],
+        [fresh, "None", "Rice", "200"],
+        [fresh, "42", "Rice", "200"],
+    ]
+    shard = store.shard_file("007")
+    with open(shard, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+    store.apply_retention()
+
+    with open(shard, newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f))[1:] == rows[1:]
+    (segment,) = store._archive_files(shard)
+    with gzip.open(segment, "rt", newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f))[1:] == rows[:1]
+
+
+def test_load_numeric_looking_names_and_whole_second_times(tmp_path):
+    store = HistoryStore(tmp_path, "cal_rec", n_buckets=1, retention_days=30)
+    now = datetime.now()
+    # A microsecond-0 timestamp is written without ".ffffff"
+    store.append(record(now.replace(microsecond=0), "007"), "007")
+    store.append(record(now, "42"), "42")
+
+    since = now - timedelta(days=6)
+    assert store.load("007", since=since)["name"].tolist() == ["007"]
+    assert store.latest("007")["name"] == "007"
+    assert store.load("7").empty